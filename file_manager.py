@@ -9,18 +9,111 @@ warped_4_video -> Warped
 
 import os
 import argparse
+import asyncio
+import contextlib
+import json
 import sys
 import subprocess
+import shutil
+import tempfile
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import defaultdict
+from fractions import Fraction
+from functools import lru_cache, partial
 from pathlib import Path
+
+# Short clips do not need ffmpeg's default probing; keep OpenCV's capture open fast
+# (set before cv2 is imported, can be overridden from the environment)
+os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", "analyzeduration;100000|probesize;500000")
+
 import cv2
 import numpy as np
 
-def rename_videos_in_dl3dv(base_path="DL3DV"):
+try:
+    import av
+except ImportError:
+    av = None
+
+# VideoCapture properties, bound once instead of looked up on cv2 at every call
+_CAP_FPS, _CAP_W, _CAP_H, _CAP_N = cv2.CAP_PROP_FPS, cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FRAME_COUNT
+
+
+def _print_summary(title: str, counts: dict, errors: list) -> bool:
+    """
+    Print the summary of an action: its counters followed by the errors encountered.
+    
+    Args:
+        title: Completion message, e.g. "Renaming completed!"
+        counts: Mapping of counter labels to values, printed in order
+        errors: Error messages collected by the action
+        
+    Returns:
+        True if no errors were encountered, False otherwise
+    """
+    print(f"\n{'='*50}")
+    print(title)
+    for label, value in counts.items():
+        print(f"{label}: {value}")
+    
+    if errors:
+        print(f"Errors encountered: {len(errors)}")
+        for error in errors:
+            print(f"  - {error}")
+    else:
+        print("No errors encountered!")
+    
+    return len(errors) == 0
+
+
+def _rename_dl3dv_subdir(subdir: Path, rename_mapping: dict) -> tuple:
+    """
+    Rename the video files of a single DL3DV subdirectory according to the mapping.
+    
+    Args:
+        subdir: Path to the DL3DV subdirectory
+        rename_mapping: Mapping of original filenames to new filenames
+        
+    Returns:
+        Tuple of (number of files renamed, list of error messages)
+    """
+    print(f"\nProcessing directory: {subdir.name}")
+    
+    total_renamed = 0
+    errors = []
+    
+    # List the files of this subdirectory once instead of checking each name
+    with os.scandir(subdir) as entries:
+        present = {entry.name: entry.path for entry in entries if entry.is_file()}
+    
+    # Rename files in this subdirectory
+    for old_name, new_name in rename_mapping.items():
+        if old_name in present:
+            try:
+                os.replace(present[old_name], os.path.join(subdir, new_name))
+                print(f"  ✓ Renamed: {old_name} -> {new_name}")
+                total_renamed += 1
+            except Exception as e:
+                error_msg = f"  ✗ Failed to rename {old_name}: {e}"
+                print(error_msg)
+                errors.append(f"{subdir.name}/{old_name}: {e}")
+        else:
+            print(f"  - File not found: {old_name}")
+    
+    return total_renamed, errors
+
+
+def rename_videos_in_dl3dv(base_path="DL3DV", max_workers=None):
     """
     Rename video files in all subdirectories of DL3DV according to the mapping.
+    Subdirectories are processed concurrently with a thread pool (renames are pure
+    filesystem metadata operations).
     
     Args:
         base_path (str): Path to the DL3DV directory
+        max_workers (int): Maximum number of worker threads (default: one per subdirectory, up to 32)
     """
     
     # Define the renaming mapping
@@ -31,204 +124,527 @@ def rename_videos_in_dl3dv(base_path="DL3DV"):
         "warped_4_video.mp4": "Warped.mp4"
     }
     
-    # Check if DL3DV directory exists
-    dl3dv_path = Path(base_path)
-    if not dl3dv_path.exists():
-        print(f"Error: Directory '{base_path}' does not exist!")
+    # Process the subdirectories of DL3DV in parallel
+    result = _foreach_subdir(
+        base_path, None, partial(_rename_dl3dv_subdir, rename_mapping=rename_mapping), max_workers,
+        default_jobs=32, threads=True
+    )
+    if result is None:
         return False
+    total_renamed, errors = result
     
-    # Get all subdirectories in DL3DV
-    subdirs = [d for d in dl3dv_path.iterdir() if d.is_dir()]
-    
-    if not subdirs:
-        print(f"No subdirectories found in '{base_path}'")
-        return False
+    # Summary
+    return _print_summary("Renaming completed!", {"Total files renamed": total_renamed}, errors)
+
+
+def _rename_mcbench_subdir(subdir: Path) -> tuple:
+    """
+    Extract the mp4 files hidden in *.mp4 directories of a single MC-Bench subdirectory.
     
-    print(f"Found {len(subdirs)} subdirectories in '{base_path}'")
+    Args:
+        subdir: Path to the MC-Bench subdirectory
+        
+    Returns:
+        Tuple of (number of directories processed, list of error messages)
+    """
+    print(f"\nProcessing directory: {subdir.name}")
     
-    total_renamed = 0
+    total_processed = 0
     errors = []
     
-    # Process each subdirectory
-    for subdir in subdirs:
-        print(f"\nProcessing directory: {subdir.name}")
-        
-        # Rename files in this subdirectory
-        for old_name, new_name in rename_mapping.items():
-            old_path = subdir / old_name
-            new_path = subdir / new_name
+    # Look for mp4 files/directories
+    mp4_items = list(subdir.glob("*.mp4"))
+    
+    for mp4_item in mp4_items:
+        if mp4_item.is_dir():
+            print(f"  Found directory named: {mp4_item.name}")
+            
+            # Check if there's exactly one mp4 file inside
+            mp4_files_inside = list(mp4_item.glob("*.mp4"))
             
-            if old_path.exists():
+            if len(mp4_files_inside) == 1:
+                mp4_file = mp4_files_inside[0]
+                temp_path = subdir / f"temp_{mp4_item.name}"
+                target_path = subdir / mp4_item.name
+                
                 try:
-                    old_path.rename(new_path)
-                    print(f"  ✓ Renamed: {old_name} -> {new_name}")
-                    total_renamed += 1
+                    # Move the file to a temporary name first
+                    mp4_file.rename(temp_path)
+                    print(f"    ✓ Moved: {mp4_file.name} -> temp_{mp4_item.name}")
+                    
+                    # Remove the empty directory
+                    mp4_item.rmdir()
+                    print(f"    ✓ Removed directory: {mp4_item.name}")
+                    
+                    # Now rename to the final target name
+                    temp_path.rename(target_path)
+                    print(f"    ✓ Renamed: temp_{mp4_item.name} -> {mp4_item.name}")
+                    
+                    total_processed += 1
+                    
                 except Exception as e:
-                    error_msg = f"  ✗ Failed to rename {old_name}: {e}"
+                    error_msg = f"    ✗ Failed to process {mp4_item.name}: {e}"
                     print(error_msg)
-                    errors.append(f"{subdir.name}/{old_name}: {e}")
+                    errors.append(f"{subdir.name}/{mp4_item.name}: {e}")
+                    # Clean up temp file if it exists
+                    if temp_path.exists():
+                        temp_path.unlink()
+                    
+            elif len(mp4_files_inside) == 0:
+                print(f"    - No mp4 files found in directory: {mp4_item.name}")
+                errors.append(f"{subdir.name}/{mp4_item.name}: No mp4 files found")
             else:
-                print(f"  - File not found: {old_name}")
+                print(f"    - Multiple mp4 files found in directory: {mp4_item.name}")
+                errors.append(f"{subdir.name}/{mp4_item.name}: Multiple mp4 files found")
     
-    # Summary
-    print(f"\n{'='*50}")
-    print(f"Renaming completed!")
-    print(f"Total files renamed: {total_renamed}")
-    
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
-    else:
-        print("No errors encountered!")
-    
-    return len(errors) == 0
+    return total_processed, errors
 
 
-def rename_mcbench_videos(base_path="MC-Bench"):
+def rename_mcbench_videos(base_path="MC-Bench", max_workers=None):
     """
     Rename videos in MC-Bench directory by extracting mp4 files from subdirectories.
     For each ID folder, if any *.mp4 file is actually a directory, extract the single mp4
     file from it and rename it to the directory name.
+    Subdirectories are processed concurrently with a thread pool (the work is I/O bound).
     
     Args:
         base_path (str): Path to the MC-Bench directory
+        max_workers (int): Maximum number of worker threads (default: one per subdirectory, up to the CPU count)
     """
     
-    # Check if MC-Bench directory exists
-    mc_bench_path = Path(base_path)
-    if not mc_bench_path.exists():
-        print(f"Error: Directory '{base_path}' does not exist!")
+    # Process the subdirectories of MC-Bench in parallel
+    result = _foreach_subdir(base_path, None, _rename_mcbench_subdir, max_workers, threads=True)
+    if result is None:
         return False
+    total_processed, errors = result
+    
+    # Summary
+    return _print_summary("MC-Bench renaming completed!", {"Total directories processed": total_processed}, errors)
+
+
+def crop_slices(frame_shape: tuple, crop_params: dict) -> tuple:
+    """
+    Resolve crop parameters into row and column slices for frames of a given shape.
+    All frames of a video share the same shape, so this only needs to run once per video.
+    
+    Args:
+        frame_shape: Shape of the frames to crop (height, width, ...)
+        crop_params: Dictionary with 'x', 'y', 'w', 'h' keys
+        
+    Returns:
+        Tuple of (row slice, column slice)
+    """
+    x, y, w, h = crop_params['x'], crop_params['y'], crop_params['w'], crop_params['h']
+    
+    # Handle special cases where w or h are 0 (meaning crop to end)
+    if y + h == 0:
+        h = frame_shape[0] - y
+    if x + w == 0:
+        w = frame_shape[1] - x
+    
+    return slice(y, y+h), slice(x, x+w)
+
+
+# Threads each pool worker may use, set by _init_worker (None outside of worker processes)
+_worker_threads = None
+
+
+def _init_worker(num_threads: int):
+    """
+    Process pool initializer capping the threads of OpenCV, OpenMP and the ffmpeg
+    subprocesses, so that parallel workers do not oversubscribe the CPU.
+    
+    Args:
+        num_threads: Number of threads each worker may use
+    """
+    global _worker_threads
+    _worker_threads = num_threads
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)  # inherited by ffmpeg subprocesses
+    cv2.setNumThreads(num_threads)
+
+
+def _process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers share the CPU cores evenly (see _init_worker).
+    
+    Args:
+        max_workers: Number of worker processes
+        
+    Returns:
+        ProcessPoolExecutor
+    """
+    num_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(num_threads,))
+
+
+def _run_parallel(fn, arg_tuples, jobs: int = None, default_jobs: int = None, threads: bool = False) -> tuple:
+    """
+    Run a task once per argument tuple over a process pool and collect its results.
+    
+    Args:
+        fn: Picklable function returning (number of successes, error message(s)); the
+            number may be a bool and the errors a single message, None or a list
+        arg_tuples: Iterable of argument tuples, one per task
+        jobs: Maximum number of workers
+        default_jobs: Number of workers used when jobs is not given (default: the CPU
+            count); the pool never gets more workers than there are tasks
+        threads: Use a thread pool instead, for I/O bound tasks
+        
+    Returns:
+        Tuple of (total number of successes, list of error messages)
+    """
+    arg_tuples = list(arg_tuples)
+    if not arg_tuples:
+        return 0, []
+    
+    workers = min(jobs or default_jobs or os.cpu_count() or 1, len(arg_tuples))
+    pool = ThreadPoolExecutor(max_workers=workers) if threads else _process_pool(workers)
+    with pool as executor:
+        results = list(executor.map(fn, *zip(*arg_tuples)))
+    
+    errors = []
+    for _, error in results:
+        if isinstance(error, list):
+            errors.extend(error)
+        elif error:
+            errors.append(error)
+    return sum(successes for successes, _ in results), errors
+
+
+def _foreach_subdir(base_path, required_file: str, fn, jobs: int = None, default_jobs: int = None, threads: bool = False, skip=None):
+    """
+    Run a task for every subdirectory of a directory, see _run_parallel.
+    
+    Args:
+        base_path: Directory whose subdirectories are processed
+        required_file: File a subdirectory must contain to be processed, or None;
+            subdirectories without it are reported and left out
+        fn: Function taking the subdirectory path, see _run_parallel
+        jobs: Maximum number of workers
+        default_jobs: Number of workers used when jobs is not given
+        threads: Use a thread pool instead, for I/O bound tasks
+        skip: Optional predicate on the subdirectory path; matching subdirectories are left out
+        
+    Returns:
+        Tuple of (total number of successes, list of error messages), or None if the
+        directory does not exist or has no subdirectories
+    """
+    # Check if the directory exists
+    if not os.path.exists(base_path):
+        print(f"Error: Directory '{base_path}' does not exist!")
+        return None
     
-    # Get all subdirectories in MC-Bench
-    subdirs = [d for d in mc_bench_path.iterdir() if d.is_dir()]
+    # Get all subdirectories in a single directory listing
+    with os.scandir(base_path) as entries:
+        subdirs = [Path(entry.path) for entry in entries if entry.is_dir()]
     
     if not subdirs:
         print(f"No subdirectories found in '{base_path}'")
-        return False
+        return None
     
     print(f"Found {len(subdirs)} subdirectories in '{base_path}'")
     
-    total_processed = 0
-    errors = []
-    
-    # Process each subdirectory
+    tasks = []
     for subdir in subdirs:
-        print(f"\nProcessing directory: {subdir.name}")
+        if required_file is not None and not (subdir / required_file).is_file():
+            print(f"  - {required_file} not found in {subdir.name}")
+        elif skip is None or not skip(subdir):
+            tasks.append((subdir,))
+    
+    # Process the subdirectories in parallel
+    return _run_parallel(fn, tasks, jobs, default_jobs, threads)
+
+
+def _ffmpeg_thread_args() -> list:
+    """
+    Build the ffmpeg -threads argument for the current worker process.
+    
+    Returns:
+        List of ffmpeg command line arguments, empty outside of pool workers
+    """
+    if _worker_threads is None:
+        return []
+    return ["-threads", str(_worker_threads)]
+
+
+def _ffmpeg_available() -> bool:
+    """
+    Check whether the ffmpeg and ffprobe binaries are available on PATH.
+    
+    Returns:
+        True if both binaries can be found, False otherwise
+    """
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def _probe(video_path) -> dict:
+    """
+    Read the metadata of the first video stream with a single ffprobe call.
+    
+    Args:
+        video_path: Path to the video file
         
-        # Look for mp4 files/directories
-        mp4_items = list(subdir.glob("*.mp4"))
+    Returns:
+        Dictionary with 'width' and 'height' (ints), 'r_frame_rate' (rational string
+        understood by ffmpeg, e.g. "24/1") and 'nb_frames' (string, may be missing)
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=width,height,r_frame_rate,nb_frames", "-of", "json", str(video_path)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)["streams"][0]
+
+
+@lru_cache(maxsize=None)
+def _has_nvenc() -> bool:
+    """
+    Check whether ffmpeg can encode H.264 on an NVIDIA GPU (h264_nvenc).
+    A tiny test encode is run since the encoder may be compiled in without a usable GPU.
+    
+    Returns:
+        True if h264_nvenc works, False otherwise
+    """
+    if shutil.which("ffmpeg") is None:
+        return False
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-v", "error", "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+         "-c:v", "h264_nvenc", "-f", "null", "-"],
+        capture_output=True
+    )
+    return result.returncode == 0
+
+
+def _nvenc_attempts() -> tuple:
+    """
+    Encoder choices to try in order: NVENC when it is available, then libx264.
+    Consumer NVIDIA GPUs cap the number of concurrent NVENC sessions, so an encode can be
+    refused while other jobs hold the GPU even though _has_nvenc succeeded.
+    
+    Returns:
+        Tuple of values for the nvenc argument of _h264_encoder_args
+    """
+    return (True, False) if _has_nvenc() else (False,)
+
+
+def _h264_encoder_args(crf: int = 23, preset: str = "fast", nvenc: bool = None) -> list:
+    """
+    Build the ffmpeg arguments for H.264 encoding, preferring NVENC when it is available.
+    
+    Args:
+        crf: Constant quality level (used as -cq for NVENC)
+        preset: libx264 preset used when encoding on the CPU
+        nvenc: Encode with NVENC (default: whenever _has_nvenc succeeds)
         
-        for mp4_item in mp4_items:
-            if mp4_item.is_dir():
-                print(f"  Found directory named: {mp4_item.name}")
-                
-                # Check if there's exactly one mp4 file inside
-                mp4_files_inside = list(mp4_item.glob("*.mp4"))
-                
-                if len(mp4_files_inside) == 1:
-                    mp4_file = mp4_files_inside[0]
-                    temp_path = subdir / f"temp_{mp4_item.name}"
-                    target_path = subdir / mp4_item.name
-                    
-                    try:
-                        # Move the file to a temporary name first
-                        mp4_file.rename(temp_path)
-                        print(f"    ✓ Moved: {mp4_file.name} -> temp_{mp4_item.name}")
-                        
-                        # Remove the empty directory
-                        mp4_item.rmdir()
-                        print(f"    ✓ Removed directory: {mp4_item.name}")
-                        
-                        # Now rename to the final target name
-                        temp_path.rename(target_path)
-                        print(f"    ✓ Renamed: temp_{mp4_item.name} -> {mp4_item.name}")
-                        
-                        total_processed += 1
-                        
-                    except Exception as e:
-                        error_msg = f"    ✗ Failed to process {mp4_item.name}: {e}"
-                        print(error_msg)
-                        errors.append(f"{subdir.name}/{mp4_item.name}: {e}")
-                        # Clean up temp file if it exists
-                        if temp_path.exists():
-                            temp_path.unlink()
-                        
-                elif len(mp4_files_inside) == 0:
-                    print(f"    - No mp4 files found in directory: {mp4_item.name}")
-                    errors.append(f"{subdir.name}/{mp4_item.name}: No mp4 files found")
-                else:
-                    print(f"    - Multiple mp4 files found in directory: {mp4_item.name}")
-                    errors.append(f"{subdir.name}/{mp4_item.name}: Multiple mp4 files found")
+    Returns:
+        List of ffmpeg command line arguments
+    """
+    if nvenc is None:
+        nvenc = _has_nvenc()
+    if nvenc:
+        return ["-c:v", "h264_nvenc", "-preset", "p4", "-cq", str(crf)]
+    return ["-c:v", "libx264", "-crf", str(crf), "-preset", preset]
+
+
+@contextlib.contextmanager
+def _capture(video_path):
+    """
+    Open a cv2.VideoCapture that is released when the block exits, even on errors.
     
-    # Summary
-    print(f"\n{'='*50}")
-    print(f"MC-Bench renaming completed!")
-    print(f"Total directories processed: {total_processed}")
+    Args:
+        video_path: Path to the video file
+        
+    Yields:
+        cv2.VideoCapture, check isOpened() before reading
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        yield cap
+    finally:
+        cap.release()
+
+
+@contextlib.contextmanager
+def _writer(output_path: str, fps: float, frame_size: tuple, encoder_args: list = None):
+    """
+    Open a video writer that is released when the block exits, even on errors.
     
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
+    Args:
+        output_path: Path for the output video
+        fps: Output frame rate
+        frame_size: Frame (width, height) in pixels
+        encoder_args: ffmpeg encoder arguments; when given frames are piped into ffmpeg
+            (_FFmpegWriter), otherwise OpenCV encodes them (_open_video_writer)
+        
+    Yields:
+        Video writer, check isOpened() before writing
+    """
+    if encoder_args is not None:
+        out = _FFmpegWriter(output_path, frame_size, fps, encoder_args)
     else:
-        print("No errors encountered!")
-    
-    return len(errors) == 0
+        out = _open_video_writer(output_path, fps, frame_size)
+    try:
+        yield out
+    finally:
+        out.release()
 
 
-def crop_frame(frame: np.ndarray, crop_params: dict) -> np.ndarray:
+def _open_video_writer(output_path: str, fps: float, frame_size: tuple):
     """
-    Crop a frame according to the specified parameters.
+    Open a cv2.VideoWriter, preferring browser-playable H.264 (avc1) and falling back
+    to MPEG-4 (mp4v) when OpenCV was built without an H.264 encoder.
     
     Args:
-        frame: Input frame as numpy array
-        crop_params: Dictionary with 'x', 'y', 'w', 'h' keys
+        output_path: Path for the output video
+        fps: Output frame rate
+        frame_size: Frame (width, height) in pixels
         
     Returns:
-        Cropped frame as numpy array
+        cv2.VideoWriter, check isOpened() before writing
     """
-    x, y, w, h = crop_params['x'], crop_params['y'], crop_params['w'], crop_params['h']
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'avc1'), fps, frame_size)
+    if not out.isOpened():
+        out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, frame_size)
+    return out
+
+
+class _FFmpegError(RuntimeError):
+    """Raised by _FFmpegWriter when the ffmpeg process fails, carrying ffmpeg's error output."""
+
+
+class _FFmpegWriter:
+    """
+    cv2.VideoWriter look-alike that pipes raw BGR frames into an ffmpeg process.
     
-    # Handle special cases where w or h are 0 (meaning crop to end)
-    if y + h == 0:
-        h = frame.shape[0] - y
-    if x + w == 0:
-        w = frame.shape[1] - x
+    Encoding runs in the ffmpeg process with its own threads and produces H.264 with
+    the moov atom up front (+faststart), ready for the browser. Failures of the ffmpeg
+    process are raised as _FFmpegError.
     
-    # Perform the crop
-    frame = frame[y:y+h, x:x+w]
+    Args:
+        output_path: Path for the output video
+        frame_size: Frame (width, height) in pixels
+        fps: Output frame rate
+        encoder_args: ffmpeg encoder arguments, see _h264_encoder_args
+    """
     
-    return frame
+    def __init__(self, output_path, frame_size: tuple, fps, encoder_args: list):
+        width, height = frame_size
+        # ffmpeg's error output goes to a file, a pipe nobody reads could fill up and block it
+        self.stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            ["ffmpeg", "-y", "-v", "error",
+             "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+             *encoder_args, "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+             str(output_path)],
+            stdin=subprocess.PIPE,
+            stderr=self.stderr
+        )
+    
+    def isOpened(self) -> bool:
+        return self.proc.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        # The frame buffer is handed to the pipe without an intermediate bytes copy
+        try:
+            self.proc.stdin.write(memoryview(frame))
+        except BrokenPipeError:
+            raise self._error() from None
+    
+    def release(self):
+        try:
+            if not self.proc.stdin.closed:
+                self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            if self.proc.wait() != 0:
+                raise self._error()
+        finally:
+            self.stderr.close()
+    
+    def _error(self) -> _FFmpegError:
+        """Wait for the ffmpeg process and build an error from its output."""
+        self.proc.wait()
+        self.stderr.seek(0)
+        message = self.stderr.read().decode(errors="replace").strip()
+        return _FFmpegError(f"FFmpeg failed: {message or f'exit code {self.proc.returncode}'}")
 
 
-def resize_frame_to_height(frame: np.ndarray, target_height: int) -> np.ndarray:
+def _concatenate_videos_ffmpeg(video_paths: list, output_path: str, target_height: int, duplicate_frames: bool) -> bool:
     """
-    Resize a frame to a target height while maintaining aspect ratio.
+    Concatenate videos horizontally with a single ffmpeg scale/hstack filtergraph.
+    
+    Decoding, scaling, stacking and H.264 encoding all happen inside ffmpeg, so no
+    frame ever passes through Python.
     
     Args:
-        frame: Input frame as numpy array
-        target_height: Target height in pixels
+        video_paths: List of paths to video files
+        output_path: Path for the output concatenated video
+        target_height: Target height for all videos (they will be resized to this height)
+        duplicate_frames: If True, stretch the timestamps and halve the frame rate to slow down the video
         
     Returns:
-        Resized frame as numpy array
+        True if successful, False otherwise
     """
-    h, w = frame.shape[:2]
-    aspect_ratio = w / h
-    target_width = int(target_height * aspect_ratio)
+    # Scale every input to the target height, then stack them side by side; hstack
+    # refuses inputs whose sample aspect ratios differ, so square pixels are forced
+    filters = [f"[{i}:v]scale=-2:{target_height},setsar=1[v{i}]" for i in range(len(video_paths))]
+    labels = "".join(f"[v{i}]" for i in range(len(video_paths)))
+    if len(video_paths) > 1:
+        stack = f"{labels}hstack=inputs={len(video_paths)}:shortest=1"
+    else:
+        stack = f"{labels}null"
     
-    return cv2.resize(frame, (target_width, target_height))
+    # Slow down playback by doubling the timestamps at half the frame rate, so every
+    # frame is encoded once instead of twice
+    if duplicate_frames:
+        stack += ",setpts=2.0*PTS"
+    filters.append(f"{stack}[v]")
+    
+    input_args = []
+    for video_path in video_paths:
+        input_args += ["-i", str(video_path)]
+    input_args += ["-filter_complex", ";".join(filters), "-map", "[v]"]
+    if duplicate_frames:
+        input_args += ["-r", str(Fraction(_probe(video_paths[0])["r_frame_rate"]) / 2)]
+    
+    print(f"Concatenating videos: {len(video_paths)} videos")
+    
+    # Retry on the CPU when the GPU refuses another NVENC session
+    for nvenc in _nvenc_attempts():
+        cmd = [
+            "ffmpeg", "-y",
+            *input_args,
+            *_h264_encoder_args(nvenc=nvenc),
+            *_ffmpeg_thread_args(),
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+            str(output_path)
+        ]
+        print(f"  Running: {' '.join(cmd)}")
+        
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            break
+        print(f"  ✗ FFmpeg failed: {result.stderr}")
+    else:
+        return False
+    
+    print(f"✓ Concatenated video saved as: {output_path}")
+    return True
 
 
 def concatenate_videos_horizontally(video_paths: list, output_path: str, target_height: int = 320, duplicate_frames: bool = False) -> bool:
     """
     Concatenate multiple videos horizontally into a single video.
+    Uses an ffmpeg filtergraph when ffmpeg is installed (decoding with OpenCV and encoding
+    with ffmpeg if the filtergraph fails) and falls back to PyAV (if installed) or OpenCV.
     
     Args:
         video_paths: List of paths to video files
         output_path: Path for the output concatenated video
         target_height: Target height for all videos (they will be resized to this height)
-        duplicate_frames: If True, duplicate each frame to slow down the video
+        duplicate_frames: If True, slow down the video to half speed
         
     Returns:
         True if successful, False otherwise
@@ -237,53 +653,276 @@ def concatenate_videos_horizontally(video_paths: list, output_path: str, target_
         print("No video paths provided")
         return False
     
-    # Open all video captures
-    caps = []
-    for video_path in video_paths:
-        cap = cv2.VideoCapture(str(video_path))
-        if not cap.isOpened():
-            print(f"Failed to open video: {video_path}")
-            # Close already opened captures
-            for c in caps:
-                c.release()
-            return False
-        caps.append(cap)
+    if _ffmpeg_available():
+        try:
+            if _concatenate_videos_ffmpeg(video_paths, output_path, target_height, duplicate_frames):
+                return True
+        except Exception as e:
+            print(f"Error during concatenation: {e}")
+        
+        # Inputs the filtergraph cannot handle are decoded with OpenCV and piped back into ffmpeg
+        print("FFmpeg filtergraph failed, falling back to OpenCV decoding")
+        try:
+            return _concatenate_videos_opencv(video_paths, output_path, target_height, duplicate_frames)
+        except _FFmpegError as e:
+            # Decoding worked but ffmpeg's encoder failed, so encode without it
+            print(f"FFmpeg encoding failed, falling back to OpenCV encoding: {e}")
+            return _concatenate_videos_opencv(video_paths, output_path, target_height, duplicate_frames, pipe_to_ffmpeg=False)
+    
+    if av is not None:
+        print("FFmpeg not found, falling back to PyAV concatenation")
+        return _concatenate_videos_pyav(video_paths, output_path, target_height, duplicate_frames)
+    
+    print("FFmpeg not found, falling back to OpenCV concatenation")
+    return _concatenate_videos_opencv(video_paths, output_path, target_height, duplicate_frames)
+
+
+def _concatenate_videos_pyav(video_paths: list, output_path: str, target_height: int, duplicate_frames: bool) -> bool:
+    """
+    Concatenate multiple videos horizontally with PyAV, staying in yuv420p end to end.
+    
+    Frames are decoded lazily, scaled to the target height as yuv420p and their Y, U
+    and V planes are copied side by side into a single preallocated output frame, so no
+    BGR conversion happens on either side of the encoder and memory stays at one frame
+    per input.
+    
+    Args:
+        video_paths: List of paths to video files
+        output_path: Path for the output concatenated video
+        target_height: Target height for all videos (they will be resized to this height)
+        duplicate_frames: If True, halve the frame rate to slow down the video
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    # yuv420p subsamples chroma by two in both directions, so keep every size even
+    target_height -= target_height % 2
+    
+    containers = []
+    try:
+        for video_path in video_paths:
+            containers.append(av.open(str(video_path)))
+        streams = [container.streams.video[0] for container in containers]
+        
+        # Calculate the width of every video at the target height
+        frame_widths = [
+            int(target_height * stream.codec_context.width / stream.codec_context.height) // 2 * 2
+            for stream in streams
+        ]
+        xs = np.cumsum([0] + frame_widths)
+        total_width = int(xs[-1])
+        
+        rate = streams[0].average_rate or streams[0].guessed_rate
+        if duplicate_frames:
+            rate = rate / 2
+        
+        # Output frame in the packed yuv420p layout expected by VideoFrame.from_ndarray:
+        # the Y plane followed by the U and V planes, each flattened to total_width columns
+        # Chroma planes are sliced by element count, they only fill whole rows when the
+        # height is a multiple of 4
+        yuv = np.empty((target_height * 3 // 2, total_width), dtype=np.uint8)
+        luma_size = target_height * total_width
+        chroma_size = luma_size // 4
+        y_plane = yuv[:target_height]
+        u_plane = yuv.reshape(-1)[luma_size:luma_size + chroma_size].reshape(target_height // 2, total_width // 2)
+        v_plane = yuv.reshape(-1)[luma_size + chroma_size:].reshape(target_height // 2, total_width // 2)
+        
+        print(f"Concatenating videos: {len(video_paths)} videos")
+        print(f"Output dimensions: {total_width}x{target_height}")
+        
+        with av.open(str(output_path), "w", options={"movflags": "+faststart"}) as output:
+            out_stream = output.add_stream("libx264", rate=rate, options={"crf": "23", "preset": "fast"})
+            out_stream.width = total_width
+            out_stream.height = target_height
+            out_stream.pix_fmt = "yuv420p"
+            
+            # zip stops at the end of the shortest video
+            decoders = [container.decode(stream) for container, stream in zip(containers, streams)]
+            frame_count = 0
+            for frames in zip(*decoders):
+                for i, frame in enumerate(frames):
+                    # libswscale scales (and converts, if needed) in one SIMD pass; the planes
+                    # are then copied straight from the frame buffers into the output planes
+                    scaled = frame.reformat(width=frame_widths[i], height=target_height, format="yuv420p", interpolation="FAST_BILINEAR")
+                    for plane, out_plane, x0, x1 in (
+                        (scaled.planes[0], y_plane, xs[i], xs[i + 1]),
+                        (scaled.planes[1], u_plane, xs[i] // 2, xs[i + 1] // 2),
+                        (scaled.planes[2], v_plane, xs[i] // 2, xs[i + 1] // 2),
+                    ):
+                        rows = np.frombuffer(plane, dtype=np.uint8).reshape(plane.height, plane.line_size)
+                        out_plane[:, x0:x1] = rows[:, :plane.width]
+                
+                out_frame = av.VideoFrame.from_ndarray(yuv, format="yuv420p")
+                out_frame.pts = frame_count
+                for packet in out_stream.encode(out_frame):
+                    output.mux(packet)
+                frame_count += 1
+            
+            # Flush the encoder
+            for packet in out_stream.encode():
+                output.mux(packet)
+        
+        print(f"✓ Concatenated video saved as: {output_path}")
+        print(f"  Processed {frame_count} frames")
+        
+        return True
+        
+    except Exception as e:
+        print(f"Error during concatenation: {e}")
+        return False
+    finally:
+        for container in containers:
+            container.close()
+
+
+def _read_frames(cap, frame_queue: queue.Queue, stop_event: threading.Event, free_frames: queue.Queue = None):
+    """
+    Reader thread body: decode frames from a capture and push them into a queue.
+    A None sentinel is pushed once the video ends, the pipeline is stopped or decoding fails.
+    
+    Args:
+        cap: Opened cv2.VideoCapture
+        frame_queue: Bounded queue receiving the decoded frames
+        stop_event: Event set by the consumer to stop reading early
+        free_frames: Optional queue of frame buffers to decode into; the consumer puts
+            each buffer back once it is done with it
+    """
+    try:
+        while not stop_event.is_set():
+            buffer = free_frames.get() if free_frames is not None else None
+            ret, frame = cap.read(buffer)
+            if not ret:
+                break
+            frame_queue.put(frame)
+    finally:
+        # Always end the stream, or the consumer would wait forever after an exception
+        frame_queue.put(None)
+
+
+def _write_frames(out, frame_queue: queue.Queue, free_frames: queue.Queue = None, errors: list = None):
+    """
+    Writer thread body: write frames from a queue until a None sentinel is received.
+    After a failed write the queue keeps being drained so the producer never blocks.
+    
+    Args:
+        out: Opened cv2.VideoWriter or _FFmpegWriter
+        frame_queue: Queue of frames to write
+        free_frames: Optional queue receiving each frame buffer back once it has been written
+        errors: Optional list receiving the exception of a failed write
+    """
+    failed = False
+    while True:
+        frame = frame_queue.get()
+        if frame is None:
+            break
+        if not failed:
+            try:
+                out.write(frame)
+            except Exception as e:
+                failed = True
+                if errors is not None:
+                    errors.append(e)
+        if free_frames is not None:
+            free_frames.put(frame)
+
+
+def _stop_readers(readers: list, read_queues: list, stop_event: threading.Event):
+    """
+    Stop reader threads, draining their queues so that no reader stays blocked on a full queue.
+    
+    Args:
+        readers: Reader threads started with _read_frames
+        read_queues: Queues the readers push into
+        stop_event: Event shared with the readers
+    """
+    stop_event.set()
+    for reader, read_queue in zip(readers, read_queues):
+        while reader.is_alive():
+            try:
+                read_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        reader.join()
+
+
+def _concatenate_videos_opencv(video_paths: list, output_path: str, target_height: int, duplicate_frames: bool, prefetch: int = 16, pipe_to_ffmpeg: bool = True) -> bool:
+    """
+    Concatenate multiple videos horizontally by decoding frames with OpenCV.
+    Decoding, concatenation and encoding run as a three-stage threaded pipeline; frames are
+    encoded by an ffmpeg process when ffmpeg is installed and by OpenCV otherwise.
     
+    Args:
+        video_paths: List of paths to video files
+        output_path: Path for the output concatenated video
+        target_height: Target height for all videos (they will be resized to this height)
+        duplicate_frames: If True, halve the frame rate to slow down the video
+        prefetch: Maximum number of frames buffered between pipeline stages
+        pipe_to_ffmpeg: If False, always encode with OpenCV
+        
+    Returns:
+        True if successful, False otherwise; failures of the ffmpeg encoder are raised
+        as _FFmpegError instead
+    """
+    # Captures and the writer are registered here and released on every exit path
+    stack = contextlib.ExitStack()
     try:
+        # Open all video captures
+        caps = []
+        for video_path in video_paths:
+            cap = stack.enter_context(_capture(video_path))
+            if not cap.isOpened():
+                print(f"Failed to open video: {video_path}")
+                return False
+            caps.append(cap)
+        
         # Get video properties from the first video
-        fps = int(caps[0].get(cv2.CAP_PROP_FPS))
-        total_frames = int(caps[0].get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = caps[0].get(_CAP_FPS)
+        # Halving the frame rate slows the video down without encoding every frame twice
+        if duplicate_frames:
+            fps = fps / 2
+        total_frames = int(caps[0].get(_CAP_N))
         
         # Calculate total width
         total_width = 0
         frame_widths = []
+        source_heights = []
         
-        # Read first frame from each video to calculate dimensions
-        first_frames = []
+        # Read the dimensions of each video from the container metadata
         for i, cap in enumerate(caps):
-            ret, frame = cap.read()
-            if not ret:
-                print(f"Failed to read first frame from video {i}")
+            width = int(cap.get(_CAP_W))
+            height = int(cap.get(_CAP_H))
+            if width <= 0 or height <= 0:
+                print(f"Failed to read dimensions of video {i}")
                 return False
             
-            resized_frame = resize_frame_to_height(frame, target_height)
-            frame_width = resized_frame.shape[1]
+            frame_width = int(target_height * width / height)
             frame_widths.append(frame_width)
+            source_heights.append(height)
             total_width += frame_width
-            first_frames.append(resized_frame)
-            
-            # Reset to beginning
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
         
-        # Create output video writer with better codec
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, fps, (total_width, target_height))
+        # Each video is resized straight into its own column range of the output canvas;
+        # INTER_AREA gives better quality and is faster when shrinking frames
+        xs = np.cumsum([0] + frame_widths)
+        interpolations = [
+            cv2.INTER_AREA if target_height < source_height else cv2.INTER_LINEAR
+            for source_height in source_heights
+        ]
+        
+        # Create output video writer: pipe into ffmpeg for H.264 when it is installed,
+        # otherwise use OpenCV's own encoder. libx264 is used even with NVENC available:
+        # decoding in Python is the bottleneck here, and a GPU out of NVENC sessions
+        # would fail the whole pipeline
+        encoder_args = None
+        if pipe_to_ffmpeg and _ffmpeg_available():
+            encoder_args = [*_h264_encoder_args(preset="veryfast", nvenc=False), *_ffmpeg_thread_args()]
+        out = stack.enter_context(_writer(output_path, fps, (total_width, target_height), encoder_args))
         
         if not out.isOpened():
             print(f"Failed to create output video writer: {output_path}")
             # Try alternative codec
             fourcc = cv2.VideoWriter_fourcc(*'XVID')
             out = cv2.VideoWriter(output_path.replace('.mp4', '.avi'), fourcc, fps, (total_width, target_height))
+            stack.callback(out.release)
             if not out.isOpened():
                 print(f"Failed to create output video writer with alternative codec")
                 return False
@@ -294,71 +933,149 @@ def concatenate_videos_horizontally(video_paths: list, output_path: str, target_
         
         # Debug: Check frame counts for each video
         for i, cap in enumerate(caps):
-            frame_count_vid = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            frame_count_vid = int(cap.get(_CAP_N))
             print(f"  Video {i}: {frame_count_vid} frames")
         
+        # Preallocate the output canvases; they cycle between this thread and the writer
+        # so no frame buffer is allocated inside the loop
+        free_canvases = queue.Queue()
+        for _ in range(prefetch + 2):
+            free_canvases.put(np.empty((target_height, total_width, 3), dtype=np.uint8))
+        
+        # Start one reader thread per video and a single writer thread owning the VideoWriter
+        stop_event = threading.Event()
+        read_queues = [queue.Queue(maxsize=prefetch) for _ in caps]
+        readers = [
+            threading.Thread(target=_read_frames, args=(cap, read_queue, stop_event), daemon=True)
+            for cap, read_queue in zip(caps, read_queues)
+        ]
+        write_queue = queue.Queue(maxsize=prefetch)
+        write_errors = []
+        writer = threading.Thread(target=_write_frames, args=(out, write_queue, free_canvases, write_errors), daemon=True)
+        for thread in readers + [writer]:
+            thread.start()
+        
         # Process all frames
         frame_count = 0
-        while True:
-            frames = []
-            all_read_successfully = True
-            
-            # Read frame from each video
-            for i, cap in enumerate(caps):
-                ret, frame = cap.read()
-                if not ret:
-                    if frame_count == 0:
-                        print(f"  Warning: Video {i} has no frames or failed to read")
-                    all_read_successfully = False
+        last_progress = time.monotonic()
+        try:
+            while True:
+                frames = []
+                all_read_successfully = True
+                
+                # Get the next frame from each reader
+                for i, read_queue in enumerate(read_queues):
+                    frame = read_queue.get()
+                    if frame is None:
+                        if frame_count == 0:
+                            print(f"  Warning: Video {i} has no frames or failed to read")
+                        all_read_successfully = False
+                        break
+                    frames.append(frame)
+                
+                if not all_read_successfully:
                     break
                 
-                # Resize frame to target height
-                resized_frame = resize_frame_to_height(frame, target_height)
-                frames.append(resized_frame)
-            
-            if not all_read_successfully:
-                break
-            
-            # Concatenate frames horizontally
-            concatenated_frame = np.concatenate(frames, axis=1)
-            
-            # Write the concatenated frame
-            out.write(concatenated_frame)
-            frame_count += 1
-            
-            # If duplicate_frames is True, write the frame again to slow down the video
-            if duplicate_frames:
-                out.write(concatenated_frame)
+                # Resize every frame into its slice of a free canvas; frames that already
+                # have the target size are copied straight in
+                canvas = free_canvases.get()
+                for i, frame in enumerate(frames):
+                    if frame.shape[0] == target_height and frame.shape[1] == frame_widths[i]:
+                        np.copyto(canvas[:, xs[i]:xs[i + 1]], frame)
+                    else:
+                        cv2.resize(frame, (frame_widths[i], target_height), dst=canvas[:, xs[i]:xs[i + 1]], interpolation=interpolations[i])
+                
+                # Hand the canvas over to the writer thread
+                write_queue.put(canvas)
                 frame_count += 1
-            
-            if frame_count % 10 == 0:  # Progress update every 10 frames
-                print(f"  Processed {frame_count}/{total_frames * (2 if duplicate_frames else 1)} frames")
+                
+                # Progress update at most once per second
+                now = time.monotonic()
+                if now - last_progress > 1.0:
+                    print(f"  Processed {frame_count}/{total_frames} frames")
+                    last_progress = now
+        finally:
+            # Let the writer drain its queue and stop the readers before releasing anything
+            write_queue.put(None)
+            writer.join()
+            _stop_readers(readers, read_queues, stop_event)
         
-        # Clean up
-        for cap in caps:
-            cap.release()
-        out.release()
+        if write_errors:
+            raise write_errors[0]
+        
+        # Clean up (raises if ffmpeg failed to encode the video)
+        stack.close()
         
         print(f"✓ Concatenated video saved as: {output_path}")
         print(f"  Processed {frame_count} frames")
         
         return True
         
+    except _FFmpegError:
+        # Left to the caller, which can retry with OpenCV's encoder
+        raise
     except Exception as e:
         print(f"Error during concatenation: {e}")
-        # Clean up
-        for cap in caps:
-            cap.release()
         return False
+    finally:
+        # Only reached with resources left on failure paths, where the error is already reported
+        with contextlib.suppress(Exception):
+            stack.close()
+
+
+def _concatenate_subdir(subdir: Path, video_files: list) -> tuple:
+    """
+    Concatenate the given videos of a single subdirectory into concatenated.mp4.
+    
+    Args:
+        subdir: Path to the subdirectory
+        video_files: Video filenames to concatenate, in order
+        
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    print(f"\nProcessing directory: {subdir.name}")
+    
+    # Check if all required videos exist (listing the directory once)
+    with os.scandir(subdir) as entries:
+        names = {entry.name for entry in entries if entry.is_file()}
+    
+    video_paths = []
+    missing_videos = []
+    
+    for video_file in video_files:
+        if video_file in names:
+            video_paths.append(subdir / video_file)
+        else:
+            missing_videos.append(video_file)
+    
+    if missing_videos:
+        print(f"  ✗ Missing videos: {', '.join(missing_videos)}")
+        return False, f"{subdir.name}: Missing videos {', '.join(missing_videos)}"
+    
+    # Create output path
+    output_path = subdir / "concatenated.mp4"
+    
+    try:
+        # Concatenate videos horizontally
+        if concatenate_videos_horizontally(video_paths, str(output_path)):
+            return True, None
+        return False, f"{subdir.name}: Failed to concatenate videos"
+        
+    except Exception as e:
+        error_msg = f"  ✗ Failed to concatenate videos: {e}"
+        print(error_msg)
+        return False, f"{subdir.name}: {e}"
 
 
-def concatenate_mcbench_videos(base_path="MC-Bench"):
+def concatenate_mcbench_videos(base_path="MC-Bench", max_workers=None):
     """
     Concatenate videos in MC-Bench directory horizontally.
     Order: Warped, Ours_SVD, Drag_Anything, SGI2V, MotionPro
     
     Args:
         base_path (str): Path to the MC-Bench directory
+        max_workers (int): Maximum number of worker processes (default: one per subdirectory, up to the CPU count)
     """
     
     # MC-Bench video order and filenames
@@ -370,84 +1087,26 @@ def concatenate_mcbench_videos(base_path="MC-Bench"):
         "MotionPro_cropped.mp4"
     ]
     
-    # Check if MC-Bench directory exists
-    mc_bench_path = Path(base_path)
-    if not mc_bench_path.exists():
-        print(f"Error: Directory '{base_path}' does not exist!")
-        return False
-    
-    # Get all subdirectories in MC-Bench
-    subdirs = [d for d in mc_bench_path.iterdir() if d.is_dir()]
-    
-    if not subdirs:
-        print(f"No subdirectories found in '{base_path}'")
-        return False
-    
-    print(f"Found {len(subdirs)} subdirectories in '{base_path}'")
     print(f"Concatenating videos in order: {', '.join(video_files)}")
     
-    total_processed = 0
-    errors = []
-    
-    # Process each subdirectory
-    for subdir in subdirs:
-        print(f"\nProcessing directory: {subdir.name}")
-        
-        # Check if all required videos exist
-        video_paths = []
-        missing_videos = []
-        
-        for video_file in video_files:
-            video_path = subdir / video_file
-            if video_path.exists():
-                video_paths.append(video_path)
-            else:
-                missing_videos.append(video_file)
-        
-        if missing_videos:
-            print(f"  ✗ Missing videos: {', '.join(missing_videos)}")
-            errors.append(f"{subdir.name}: Missing videos {', '.join(missing_videos)}")
-            continue
-        
-        # Create output path
-        output_path = subdir / "concatenated.mp4"
-        
-        try:
-            # Concatenate videos horizontally
-            success = concatenate_videos_horizontally(video_paths, str(output_path))
-            
-            if success:
-                total_processed += 1
-            else:
-                errors.append(f"{subdir.name}: Failed to concatenate videos")
-                
-        except Exception as e:
-            error_msg = f"  ✗ Failed to concatenate videos: {e}"
-            print(error_msg)
-            errors.append(f"{subdir.name}: {e}")
+    # Process the subdirectories of MC-Bench in parallel
+    result = _foreach_subdir(base_path, None, partial(_concatenate_subdir, video_files=video_files), max_workers)
+    if result is None:
+        return False
+    total_processed, errors = result
     
     # Summary
-    print(f"\n{'='*50}")
-    print(f"MC-Bench concatenation completed!")
-    print(f"Total directories processed: {total_processed}")
-    
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
-    else:
-        print("No errors encountered!")
-    
-    return len(errors) == 0
+    return _print_summary("MC-Bench concatenation completed!", {"Total directories processed": total_processed}, errors)
 
 
-def concatenate_dl3dv_videos(base_path="DL3DV"):
+def concatenate_dl3dv_videos(base_path="DL3DV", max_workers=None):
     """
     Concatenate videos in DL3DV directory horizontally.
     Order: Warped, Ours, GWTF, GroundTruth
     
     Args:
         base_path (str): Path to the DL3DV directory
+        max_workers (int): Maximum number of worker processes (default: one per subdirectory, up to the CPU count)
     """
     
     # DL3DV video order and filenames (try renamed versions first, then original names)
@@ -455,87 +1114,60 @@ def concatenate_dl3dv_videos(base_path="DL3DV"):
         "Warped.mp4",
         "Ours.mp4",
         "GWTF.mp4", 
-        "GroundTruth.mp4"
-    ]
-    
-    # Check if DL3DV directory exists
-    dl3dv_path = Path(base_path)
-    if not dl3dv_path.exists():
-        print(f"Error: Directory '{base_path}' does not exist!")
-        return False
-    
-    # Get all subdirectories in DL3DV
-    subdirs = [d for d in dl3dv_path.iterdir() if d.is_dir()]
-    
-    if not subdirs:
-        print(f"No subdirectories found in '{base_path}'")
-        return False
-    
-    print(f"Found {len(subdirs)} subdirectories in '{base_path}'")
-    print(f"Concatenating videos in order: Warped, Ours, GWTF, GroundTruth")
-    
-    total_processed = 0
-    errors = []
-    
-    # Process each subdirectory
-    for subdir in subdirs:
-        print(f"\nProcessing directory: {subdir.name}")
-        
-        # Check if all required videos exist
-        video_paths = []
-        missing_videos = []
-        
-        for video_file in video_files:
-            video_path = subdir / video_file
-            if video_path.exists():
-                video_paths.append(video_path)
-            else:
-                missing_videos.append(video_file)
-        
-        if missing_videos:
-            print(f"  ✗ Missing videos: {', '.join(missing_videos)}")
-            errors.append(f"{subdir.name}: Missing videos {', '.join(missing_videos)}")
-            continue
-        
-        # Create output path
-        output_path = subdir / "concatenated.mp4"
-        
-        try:
-            # Concatenate videos horizontally
-            success = concatenate_videos_horizontally(video_paths, str(output_path))
-            
-            if success:
-                total_processed += 1
-            else:
-                errors.append(f"{subdir.name}: Failed to concatenate videos")
-                
-        except Exception as e:
-            error_msg = f"  ✗ Failed to concatenate videos: {e}"
-            print(error_msg)
-            errors.append(f"{subdir.name}: {e}")
+        "GroundTruth.mp4"
+    ]
+    
+    print(f"Concatenating videos in order: Warped, Ours, GWTF, GroundTruth")
+    
+    # Process the subdirectories of DL3DV in parallel
+    result = _foreach_subdir(base_path, None, partial(_concatenate_subdir, video_files=video_files), max_workers)
+    if result is None:
+        return False
+    total_processed, errors = result
     
     # Summary
-    print(f"\n{'='*50}")
-    print(f"DL3DV concatenation completed!")
-    print(f"Total directories processed: {total_processed}")
+    return _print_summary("DL3DV concatenation completed!", {"Total directories processed": total_processed}, errors)
+
+
+def _concatenate_pair(warped_video: Path, ours_video: Path, output_path: Path, is_camera_control: bool) -> tuple:
+    """
+    Concatenate a warped/ours video pair side by side.
     
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
-    else:
-        print("No errors encountered!")
+    Args:
+        warped_video: Path to the warped video
+        ours_video: Path to the ours video
+        output_path: Path for the concatenated video
+        is_camera_control: If True, halve the frame rate for slower playback
+        
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    print(f"\nProcessing pair: {warped_video.name} + {ours_video.name}")
     
-    return len(errors) == 0
+    try:
+        # Concatenate videos horizontally with frame duplication for camera control videos
+        success = concatenate_videos_horizontally([warped_video, ours_video], str(output_path), duplicate_frames=is_camera_control)
+        
+        if success:
+            if is_camera_control:
+                print(f"  ✓ Camera control video - frame rate halved for slower playback")
+            return True, None
+        return False, f"{warped_video.name} + {ours_video.name}: Failed to concatenate"
+        
+    except Exception as e:
+        error_msg = f"  ✗ Failed to concatenate {warped_video.name} + {ours_video.name}: {e}"
+        print(error_msg)
+        return False, f"{warped_video.name} + {ours_video.name}: {e}"
 
 
-def concatenate_user_videos(base_path="UserCameraControl", object_path="UserObjectControl"):
+def concatenate_user_videos(base_path="UserCameraControl", object_path="UserObjectControl", max_workers=None):
     """
     Concatenate pairs of warped/ours videos from UserCameraControl and UserObjectControl directories.
     
     Args:
         base_path (str): Path to the UserCameraControl directory
         object_path (str): Path to the UserObjectControl directory
+        max_workers (int): Maximum number of worker processes (default: one per pair, up to the CPU count)
     """
     
     # Check if both directories exist
@@ -557,48 +1189,23 @@ def concatenate_user_videos(base_path="UserCameraControl", object_path="UserObje
     print(f"Found {len(camera_videos)} videos in {base_path}")
     print(f"Found {len(object_videos)} videos in {object_path}")
     
-    # Create pairs by matching video names with flexible matching
-    pairs_found = []
-    camera_processed = set()
-    object_processed = set()
     def normalize_name(name):
-            """Normalize video names for better matching"""
-            return name[:name.find('_')].lower()
+        """Normalize video names for better matching"""
+        return name.partition('_')[0].lower()
     
     def find_pairs_in_directory(videos):
         """Find pairs of warped/ours videos within a single directory"""
         
-        pairs = {}
+        pairs = defaultdict(lambda: {"ours": None, "warped": None})
         for video in videos:
-            video_name = normalize_name(video.stem)
             if "our" in video.name:
-                if video_name not in pairs:
-                    pairs[video_name] = {"ours": video}
-                else:
-                    pairs[video_name]["ours"] = video
-                    if "unknown" in pairs[video_name]:
-                        pairs[video_name]["warped"] = video
-                        del pairs[video_name]["unknown"]
+                kind = "ours"
             elif "warped" in video.name:
-                if video_name not in pairs:
-                    pairs[video_name] = {"warped": video}
-                else:
-                    pairs[video_name]["warped"] = video
-                    if "unknown" in pairs[video_name]:
-                        pairs[video_name]["ours"] = video
-                        del pairs[video_name]["unknown"]
+                kind = "warped"
             else:
-                if video_name not in pairs:
-                    pairs[video_name] = {"unknown": video}
-                else:
-                    other_name = list(pairs[video_name].keys())[0]
-                    if other_name == "ours":
-                        pairs[video_name]["warped"] = video
-                    elif other_name == "warped":
-                        pairs[video_name]["ours"] = video
-                    else:
-                        print("Found two unknown videos with the same name: ", video_name)
-                        raise ValueError("Found two unknown videos with the same name: ", video_name)
+                print(f"  ⚠ Warning: Cannot tell whether {video.name} is a warped or ours video, skipping")
+                continue
+            pairs[normalize_name(video.stem)][kind] = video
         
         return pairs
     
@@ -609,30 +1216,20 @@ def concatenate_user_videos(base_path="UserCameraControl", object_path="UserObje
     print(f"Found {len(camera_pairs)} pairs in {base_path}")
     print(f"Found {len(object_pairs)} pairs in {object_path}")
     
-    # Process camera pairs
+    # Collect complete pairs from both directories
     pairs_found = []
     camera_processed = set()
-    
-    for pair_name, pair_videos in camera_pairs.items():
-        if "ours" in pair_videos and "warped" in pair_videos:
-            pairs_found.append((pair_videos["warped"], pair_videos["ours"]))
-            camera_processed.add(pair_videos["warped"])
-            camera_processed.add(pair_videos["ours"])
-        else:
-            missing_type = "warped" if "ours" in pair_videos else "ours"
-            print(f"  ⚠ Warning: Missing {missing_type} video for {pair_name}")
-    
-    # Process object pairs
     object_processed = set()
     
-    for pair_name, pair_videos in object_pairs.items():
-        if "ours" in pair_videos and "warped" in pair_videos:
-            pairs_found.append((pair_videos["warped"], pair_videos["ours"]))
-            object_processed.add(pair_videos["warped"])
-            object_processed.add(pair_videos["ours"])
-        else:
-            missing_type = "warped" if "ours" in pair_videos else "ours"
-            print(f"  ⚠ Warning: Missing {missing_type} video for {pair_name}")
+    for pairs, processed in ((camera_pairs, camera_processed), (object_pairs, object_processed)):
+        for pair_name, pair_videos in pairs.items():
+            if pair_videos["ours"] and pair_videos["warped"]:
+                pairs_found.append((pair_videos["warped"], pair_videos["ours"]))
+                processed.add(pair_videos["warped"])
+                processed.add(pair_videos["ours"])
+            else:
+                missing_type = "warped" if pair_videos["ours"] else "ours"
+                print(f"  ⚠ Warning: Missing {missing_type} video for {pair_name}")
     
     # Check for unmatched videos
     unmatched_camera = set(camera_videos) - camera_processed
@@ -649,60 +1246,163 @@ def concatenate_user_videos(base_path="UserCameraControl", object_path="UserObje
     
     print(f"\nFound {len(pairs_found)} matching video pairs")
     
-    total_processed = 0
-    errors = []
-    
-    # Process each pair
+    # Output next to the warped video, named after the normalized video name; camera
+    # control videos (from the UserCameraControl directory) are slowed down
+    tasks = []
     for warped_video, ours_video in pairs_found:
-        print(f"\nProcessing pair: {warped_video.name} + {ours_video.name}")
+        is_camera_control = warped_video.parent == camera_path
+        output_dir = camera_path if is_camera_control else object_path
+        output_path = output_dir / f"{normalize_name(warped_video.stem)}_concatenated.mp4"
+        tasks.append((warped_video, ours_video, output_path, is_camera_control))
+    
+    # Process the pairs in parallel
+    total_processed, errors = _run_parallel(_concatenate_pair, tasks, max_workers)
+    
+    # Summary
+    return _print_summary("User video concatenation completed!", {"Total pairs processed": total_processed}, errors)
+
+
+async def _probe_codec(video_file: Path) -> tuple:
+    """
+    Read the codec and pixel format of the first video stream with ffprobe, without
+    blocking the event loop.
+    
+    Args:
+        video_file: Path to the video file
         
-        # Create output path (use normalized video name, determine directory)
-        normalized_name = normalize_name(warped_video.stem)
-        if warped_video.parent == camera_path:
-            output_path = camera_path / f"{normalized_name}_concatenated.mp4"
-        else:
-            output_path = object_path / f"{normalized_name}_concatenated.mp4"
+    Returns:
+        Tuple of (codec name, pixel format), e.g. ("h264", "yuv420p"), with empty
+        strings if they cannot be determined
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name,pix_fmt", "-of", "csv=p=0", str(video_file),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await proc.communicate()
+    if proc.returncode != 0:
+        return "", ""
+    codec_name, _, pix_fmt = stdout.decode().strip().partition(",")
+    return codec_name, pix_fmt
+
+
+async def _reencode_video(video_file: Path, semaphore: asyncio.Semaphore, overwrite_for_rencode: bool = False, threads_per_job: int = 2) -> tuple:
+    """
+    Re-encode a single concatenated video to concatenated_fixed.mp4.
+    H.264 videos are stream-copied instead of being encoded again.
+    
+    Args:
+        video_file: Path to the concatenated video
+        semaphore: Semaphore limiting the number of concurrent ffmpeg processes
+        overwrite_for_rencode: Overwrite an existing concatenated_fixed.mp4
+        threads_per_job: Number of threads given to each ffmpeg process
+        
+    Returns:
+        Tuple of (whether the file was re-encoded, error message or None)
+    """
+    # Create output filename
+    output_file = video_file.parent / video_file.name.replace("concatenated.mp4", "concatenated_fixed.mp4")
+    if output_file.exists() and not overwrite_for_rencode:
+        print(f"\nSkipping: {output_file} already exists")
+        return False, None
+    
+    async with semaphore:
+        print(f"\nProcessing: {video_file}")
+        
+        if output_file.exists() and overwrite_for_rencode:
+            print(f"  Overwriting: {output_file}")
+            os.remove(output_file)
         
         try:
-            # Determine if this is a camera control video (from UserCameraControl directory)
-            is_camera_control = warped_video.parent == camera_path
+            # Videos that are already browser-playable H.264 (4:2:0, 8 bit) only need
+            # remuxing with the moov atom up front
+            if await _probe_codec(video_file) == ("h264", "yuv420p"):
+                print("  Already H.264 (yuv420p), copying the stream")
+                attempts = [["-c", "copy"]]
+            else:
+                # Retry on the CPU when the GPU refuses another NVENC session
+                attempts = [
+                    [*_h264_encoder_args(nvenc=nvenc), "-pix_fmt", "yuv420p", "-threads", str(threads_per_job)]
+                    for nvenc in _nvenc_attempts()
+                ]
             
-            # Concatenate videos horizontally with frame duplication for camera control videos
-            success = concatenate_videos_horizontally([warped_video, ours_video], str(output_path), duplicate_frames=is_camera_control)
+            for codec_args in attempts:
+                # Build ffmpeg command
+                cmd = [
+                    "ffmpeg", "-y",
+                    "-i", str(video_file),
+                    *codec_args,
+                    "-movflags", "+faststart",
+                    str(output_file)
+                ]
+                
+                print(f"  Running: {' '.join(cmd)}")
+                
+                # Run ffmpeg without blocking the other jobs
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await proc.communicate()
+                
+                if proc.returncode == 0:
+                    print(f"  ✓ Successfully re-encoded: {output_file.name}")
+                    
+                    # Optionally remove original file (uncomment if desired)
+                    # video_file.unlink()
+                    # print(f"  ✓ Removed original file: {video_file.name}")
+                    
+                    return True, None
+                
+                stderr = stderr.decode(errors="replace")
+                error_msg = f"  ✗ FFmpeg failed: {stderr}"
+                print(error_msg)
             
-            if success:
-                total_processed += 1
-                if is_camera_control:
-                    print(f"  ✓ Camera control video - frames duplicated for slower playback")
-            else:
-                errors.append(f"{warped_video.name} + {ours_video.name}: Failed to concatenate")
+            return False, f"{video_file}: {stderr}"
                 
+        except FileNotFoundError:
+            error_msg = "  ✗ FFmpeg not found! Please install FFmpeg and ensure it's in your PATH"
+            print(error_msg)
+            return False, f"{video_file}: FFmpeg not found"
         except Exception as e:
-            error_msg = f"  ✗ Failed to concatenate {warped_video.name} + {ours_video.name}: {e}"
+            error_msg = f"  ✗ Failed to process {video_file}: {e}"
             print(error_msg)
-            errors.append(f"{warped_video.name} + {ours_video.name}: {e}")
-    
-    # Summary
-    print(f"\n{'='*50}")
-    print(f"User video concatenation completed!")
-    print(f"Total pairs processed: {total_processed}")
-    
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
-    else:
-        print("No errors encountered!")
+            return False, f"{video_file}: {e}"
+
+
+async def _reencode_videos(video_files: list, overwrite_for_rencode: bool, max_jobs: int, threads_per_job: int) -> list:
+    """
+    Re-encode videos with at most max_jobs ffmpeg processes running at once.
     
-    return len(errors) == 0
+    Args:
+        video_files: Paths to the concatenated videos
+        overwrite_for_rencode: Overwrite existing concatenated_fixed.mp4 files
+        max_jobs: Maximum number of concurrent ffmpeg processes
+        threads_per_job: Number of threads given to each ffmpeg process
+        
+    Returns:
+        List of (re-encoded, error message or None) tuples, one per video
+    """
+    semaphore = asyncio.Semaphore(max_jobs)
+    return await asyncio.gather(*[
+        _reencode_video(video_file, semaphore, overwrite_for_rencode, threads_per_job)
+        for video_file in video_files
+    ])
 
 
-def reencode_concatenated_videos(base_path=".", overwrite_for_rencode=False):
+def reencode_concatenated_videos(base_path=".", overwrite_for_rencode=False, max_workers=None, threads_per_job=2):
     """
     Recursively find all concatenated.mp4 files and re-encode them for better browser compatibility.
+    Several ffmpeg processes run concurrently, each limited to threads_per_job threads.
     
     Args:
         base_path (str): Path to start searching from (default: current directory)
+        overwrite_for_rencode (bool): Overwrite existing concatenated_fixed.mp4 files
+        max_workers (int): Maximum number of concurrent ffmpeg processes (default: CPU count / threads_per_job)
+        threads_per_job (int): Number of threads given to each ffmpeg process
     """
     
     base_path = Path(base_path)
@@ -713,7 +1413,12 @@ def reencode_concatenated_videos(base_path=".", overwrite_for_rencode=False):
     print(f"Searching for concatenated.mp4 files in: {base_path}")
     
     # Find all concatenated.mp4 files recursively
-    concatenated_files = list(base_path.rglob("*concatenated.mp4"))
+    concatenated_files = [
+        Path(root, name)
+        for root, _, files in os.walk(base_path, followlinks=False)
+        for name in files
+        if name.endswith("concatenated.mp4")
+    ]
     
     if not concatenated_files:
         print("No concatenated.mp4 files found!")
@@ -721,200 +1426,361 @@ def reencode_concatenated_videos(base_path=".", overwrite_for_rencode=False):
     
     print(f"Found {len(concatenated_files)} concatenated.mp4 files")
     
-    total_processed = 0
-    errors = []
+    # Run the ffmpeg processes concurrently
+    max_jobs = min(max_workers or max(1, (os.cpu_count() or 1) // threads_per_job), len(concatenated_files))
+    results = asyncio.run(_reencode_videos(concatenated_files, overwrite_for_rencode, max_jobs, threads_per_job))
     
-    # Process each file
-    for video_file in concatenated_files:
-        print(f"\nProcessing: {video_file}")
+    total_processed = sum(1 for processed, _ in results if processed)
+    errors = [error for _, error in results if error]
+    
+    # Summary
+    return _print_summary("Re-encoding completed!", {"Total files processed": total_processed}, errors)
+
+
+def _motionpro_crop_params(height: int, crop_params: dict) -> dict:
+    """
+    Pick the crop parameters for a MotionPro video based on its aspect ratio.
+    
+    Args:
+        height: Height of the MotionPro video in pixels
+        crop_params: Crop parameters for the normal aspect ratio
         
-        # Create output filename
-        output_file = video_file.parent / video_file.name.replace("concatenated.mp4", "concatenated_fixed.mp4")
-        if output_file.exists() and not overwrite_for_rencode:
-            print(f"  Skipping: {output_file} already exists")
-            continue
-        elif output_file.exists() and overwrite_for_rencode:
-            print(f"  Overwriting: {output_file}")
-            os.remove(output_file)
+    Returns:
+        Dictionary with 'x', 'y', 'w', 'h' keys
+    """
+    if height == 512:  # Flipped aspect ratio (512x320)
+        print(f"  Detected flipped aspect ratio, adjusting crop parameters")
+        return {'x': -320, 'y': 0, 'w': 320, 'h': 512}
+    # Normal aspect ratio (320x512)
+    return crop_params
+
+
+def _crop_motionpro_ffmpeg(motionpro_file: Path, output_file: Path, crop_params: dict) -> tuple:
+    """
+    Crop a MotionPro video with a single ffmpeg crop filter.
+    Decodes and encodes on an NVIDIA GPU (NVENC) when one is available.
+    
+    Args:
+        motionpro_file: Path to the MotionPro video
+        output_file: Path for the cropped video
+        crop_params: Crop parameters for the normal aspect ratio
         
-        try:
-            # Build ffmpeg command
-            cmd = [
-                "ffmpeg",
-                "-i", str(video_file),
-                "-c:v", "libx264",
-                "-crf", "23",
-                "-preset", "fast",
-                "-movflags", "+faststart",
-                str(output_file)
-            ]
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    info = _probe(motionpro_file)
+    width, height = info["width"], info["height"]
+    print(f"  Video properties: {width}x{height}")
+    
+    # Resolve the crop bounds into absolute pixel coordinates for the crop filter
+    rows, cols = crop_slices((height, width), _motionpro_crop_params(height, crop_params))
+    y0, y1, _ = rows.indices(height)
+    x0, x1, _ = cols.indices(width)
+    
+    # Retry on the CPU when the GPU refuses another NVENC session
+    for nvenc in _nvenc_attempts():
+        cmd = ["ffmpeg", "-y"]
+        if nvenc:
+            # Decode on the GPU too; frames are downloaded for the crop filter, which is
+            # cheap next to decoding and encoding
+            cmd += ["-hwaccel", "cuda"]
+        cmd += [
+            "-i", str(motionpro_file),
+            "-vf", f"crop={x1 - x0}:{y1 - y0}:{x0}:{y0}",
+            *_h264_encoder_args(preset="veryfast", nvenc=nvenc),
+            *_ffmpeg_thread_args(),
+            # Keep the source timestamps and audio untouched (-vsync rather than -fps_mode,
+            # which needs ffmpeg 5.1)
+            "-vsync", "passthrough",
+            "-pix_fmt", "yuv420p",
+            "-c:a", "copy",
+            "-movflags", "+faststart",
+            str(output_file)
+        ]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            break
+        print(f"  ✗ FFmpeg failed: {result.stderr}")
+    else:
+        return False, f"FFmpeg failed: {result.stderr}"
+    
+    print(f"    Output dimensions: {x1 - x0}x{y1 - y0}")
+    
+    return True, None
+
+
+def _crop_video_threaded(cap, out, frame_shape: tuple, rows: slice, cols: slice, prefetch: int = 16) -> int:
+    """
+    Crop every frame of a capture into a writer with a three-stage threaded pipeline:
+    a reader thread decodes, this thread crops and a writer thread encodes.
+    Decoded and cropped frames live in preallocated buffers that cycle through the
+    pipeline, so no frame is allocated inside the loop.
+    
+    Args:
+        cap: Opened cv2.VideoCapture
+        out: Opened cv2.VideoWriter
+        frame_shape: Shape (height, width) of the decoded frames
+        rows: Row slice of the crop, see crop_slices
+        cols: Column slice of the crop, see crop_slices
+        prefetch: Maximum number of frames buffered between pipeline stages
+        
+    Returns:
+        Number of frames written
+    """
+    # Two buffers more than a queue can hold, so a stage never waits for a free buffer
+    height, width = frame_shape[:2]
+    rows_start, rows_stop, _ = rows.indices(height)
+    cols_start, cols_stop, _ = cols.indices(width)
+    free_frames = queue.Queue()
+    free_crops = queue.Queue()
+    for _ in range(prefetch + 2):
+        free_frames.put(np.empty((height, width, 3), dtype=np.uint8))
+        free_crops.put(np.empty((rows_stop - rows_start, cols_stop - cols_start, 3), dtype=np.uint8))
+    
+    stop_event = threading.Event()
+    read_queue = queue.Queue(maxsize=prefetch)
+    reader = threading.Thread(target=_read_frames, args=(cap, read_queue, stop_event, free_frames), daemon=True)
+    write_queue = queue.Queue(maxsize=prefetch)
+    write_errors = []
+    writer = threading.Thread(target=_write_frames, args=(out, write_queue, free_crops, write_errors), daemon=True)
+    reader.start()
+    writer.start()
+    
+    frame_count = 0
+    last_progress = time.monotonic()
+    try:
+        while True:
+            frame = read_queue.get()
+            if frame is None:
+                break
             
-            print(f"  Running: {' '.join(cmd)}")
+            # Copy the crop into a free buffer and hand the decode buffer back to the reader
+            cropped = free_crops.get()
+            np.copyto(cropped, frame[rows, cols])
+            free_frames.put(frame)
+            write_queue.put(cropped)
+            frame_count += 1
             
-            # Run ffmpeg command
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Progress update at most once per second
+            now = time.monotonic()
+            if now - last_progress > 1.0:
+                print(f"    Processed {frame_count} frames")
+                last_progress = now
+    finally:
+        # Let the writer drain its queue and stop the reader before returning
+        write_queue.put(None)
+        writer.join()
+        _stop_readers([reader], [read_queue], stop_event)
+    
+    if write_errors:
+        raise write_errors[0]
+    
+    return frame_count
+
+
+def _crop_motionpro_opencv(motionpro_file: Path, output_file: Path, crop_params: dict) -> tuple:
+    """
+    Crop a MotionPro video frame by frame with OpenCV.
+    
+    Args:
+        motionpro_file: Path to the MotionPro video
+        output_file: Path for the cropped video
+        crop_params: Crop parameters for the normal aspect ratio
+        
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    with _capture(motionpro_file) as cap:
+        if not cap.isOpened():
+            print(f"  ✗ Failed to open video: {motionpro_file}")
+            return False, "Failed to open video"
+        
+        # Get video properties
+        fps = cap.get(_CAP_FPS)
+        width = int(cap.get(_CAP_W))
+        height = int(cap.get(_CAP_H))
+        
+        print(f"  Video properties: {width}x{height}, {fps:g} FPS")
+        
+        # Resolve the crop bounds once, every frame has the same shape
+        rows, cols = crop_slices((height, width), _motionpro_crop_params(height, crop_params))
+        
+        # Calculate output dimensions
+        y0, y1, _ = rows.indices(height)
+        x0, x1, _ = cols.indices(width)
+        output_width = x1 - x0
+        output_height = y1 - y0
+        
+        # Create output video writer
+        with _writer(str(output_file), fps, (output_width, output_height)) as out:
+            if not out.isOpened():
+                print(f"  ✗ Failed to create output video writer")
+                return False, "Failed to create output writer"
             
-            if result.returncode == 0:
-                print(f"  ✓ Successfully re-encoded: {output_file.name}")
-                total_processed += 1
-                
-                # Optionally remove original file (uncomment if desired)
-                # video_file.unlink()
-                # print(f"  ✓ Removed original file: {video_file.name}")
-                
-            else:
-                error_msg = f"  ✗ FFmpeg failed: {result.stderr}"
-                print(error_msg)
-                errors.append(f"{video_file}: {result.stderr}")
-                
-        except FileNotFoundError:
-            error_msg = "  ✗ FFmpeg not found! Please install FFmpeg and ensure it's in your PATH"
-            print(error_msg)
-            errors.append(f"{video_file}: FFmpeg not found")
-        except Exception as e:
-            error_msg = f"  ✗ Failed to process {video_file}: {e}"
-            print(error_msg)
-            errors.append(f"{video_file}: {e}")
+            # Process frames
+            frame_count = _crop_video_threaded(cap, out, (height, width), rows, cols)
     
-    # Summary
-    print(f"\n{'='*50}")
-    print(f"Re-encoding completed!")
-    print(f"Total files processed: {total_processed}")
+    print(f"    Output dimensions: {output_width}x{output_height}")
+    print(f"    Processed {frame_count} frames")
     
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
-    else:
-        print("No errors encountered!")
+    return True, None
+
+
+def _staging_path(suffix: str) -> str:
+    """
+    Create an empty temporary file to stage an output video in.
+    Uses the tmpfs at /dev/shm when it exists, unless TMPDIR points somewhere else.
     
-    return len(errors) == 0
+    Args:
+        suffix: File suffix, e.g. ".mp4"
+        
+    Returns:
+        Path to the temporary file
+    """
+    directory = None
+    if "TMPDIR" not in os.environ and os.path.isdir("/dev/shm"):
+        directory = "/dev/shm"
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    os.close(fd)
+    return path
+
+
+def _install_file(source: Path, destination: Path):
+    """
+    Copy a finished file next to its destination and rename it into place, so the
+    destination is either the old file or the complete new one.
+    
+    Args:
+        source: Path to the finished file, e.g. a staging file on another filesystem
+        destination: Final path of the file
+    """
+    # A file created by copyfile gets the default mode under the umask
+    partial_file = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copyfile(source, partial_file)
+        os.replace(partial_file, destination)
+    except BaseException:
+        partial_file.unlink(missing_ok=True)
+        raise
+
+
+def _crop_one(subdir: Path, crop_params: dict) -> tuple:
+    """
+    Crop the MotionPro video of a single subdirectory into MotionPro_cropped.mp4.
+    
+    Args:
+        subdir: Path to the subdirectory containing MotionPro.mp4
+        crop_params: Crop parameters for the normal aspect ratio
+        
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    name = subdir.name
+    print(f"\nProcessing directory: {name}")
+    
+    motionpro_file = subdir / "MotionPro.mp4"
+    output_file = subdir / "MotionPro_cropped.mp4"
+    
+    # Encode into a local staging file and copy the finished video into place, so
+    # slow or network storage only sees one sequential copy
+    staging_file = Path(_staging_path(".mp4"))
+    
+    try:
+        success = False
+        if _ffmpeg_available():
+            success, error = _crop_motionpro_ffmpeg(motionpro_file, staging_file, crop_params)
+            if not success:
+                print("  Falling back to OpenCV cropping")
+        if not success:
+            success, error = _crop_motionpro_opencv(motionpro_file, staging_file, crop_params)
+        
+        if success:
+            _install_file(staging_file, output_file)
+            print(f"  ✓ Cropped video saved as: {output_file.name}")
+            return True, None
+        return False, f"{name}/MotionPro.mp4: {error}"
+        
+    except Exception as e:
+        error_msg = f"  ✗ Failed to process MotionPro video: {e}"
+        print(error_msg)
+        return False, f"{name}/MotionPro.mp4: {e}"
+    finally:
+        staging_file.unlink(missing_ok=True)
 
 
-def crop_motionpro_videos(base_path="MC-Bench"):
+def crop_motionpro_videos(base_path="MC-Bench", max_workers=None, force=False):
     """
     Crop MotionPro videos in MC-Bench directory according to specified parameters.
+    Uses ffmpeg when it is installed and falls back to OpenCV when it is missing or fails.
+    Videos whose cropped output is newer than the MotionPro video are skipped.
     
     Args:
         base_path (str): Path to the MC-Bench directory
+        max_workers (int): Maximum number of worker processes (default: half the CPU count,
+            since every crop is multithreaded itself)
+        force (bool): Crop all videos, even when the cropped output is up to date
     """
     
     # MotionPro crop parameters
     crop_params = {'x': -512, 'y': 0, 'w': 512, 'h': 320}
     
-    # Check if MC-Bench directory exists
-    mc_bench_path = Path(base_path)
-    if not mc_bench_path.exists():
-        print(f"Error: Directory '{base_path}' does not exist!")
-        return False
-    
-    # Get all subdirectories in MC-Bench
-    subdirs = [d for d in mc_bench_path.iterdir() if d.is_dir()]
+    up_to_date = []
     
-    if not subdirs:
-        print(f"No subdirectories found in '{base_path}'")
-        return False
+    def is_up_to_date(subdir):
+        """Check whether the cropped video is newer than the MotionPro video"""
+        if force:
+            return False
+        try:
+            cropped_mtime = os.stat(subdir / "MotionPro_cropped.mp4").st_mtime
+        except FileNotFoundError:
+            return False
+        if cropped_mtime < os.stat(subdir / "MotionPro.mp4").st_mtime:
+            return False
+        print(f"  - Skipping {subdir.name}: MotionPro_cropped.mp4 is up to date")
+        up_to_date.append(subdir.name)
+        return True
     
-    print(f"Found {len(subdirs)} subdirectories in '{base_path}'")
     print(f"Cropping MotionPro videos with parameters: {crop_params}")
     
-    total_processed = 0
-    errors = []
-    
-    # Process each subdirectory
-    for subdir in subdirs:
-        print(f"\nProcessing directory: {subdir.name}")
-        
-        motionpro_file = subdir / "MotionPro.mp4"
-        
-        if motionpro_file.exists():
-            try:
-                # Read the video
-                cap = cv2.VideoCapture(str(motionpro_file))
-                
-                if not cap.isOpened():
-                    print(f"  ✗ Failed to open video: {motionpro_file}")
-                    errors.append(f"{subdir.name}/MotionPro.mp4: Failed to open video")
-                    continue
-                
-                # Get video properties
-                fps = int(cap.get(cv2.CAP_PROP_FPS))
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                
-                print(f"  Video properties: {width}x{height}, {fps} FPS, {total_frames} frames")
-                
-                # Determine crop parameters based on aspect ratio
-                if height == 512:  # Flipped aspect ratio (512x320)
-                    print(f"  Detected flipped aspect ratio, adjusting crop parameters")
-                    crop_params_adjusted = {'x': -320, 'y': 0, 'w': 320, 'h': 512}
-                else:  # Normal aspect ratio (320x512)
-                    crop_params_adjusted = crop_params
-                
-                # Create output video writer
-                output_file = subdir / "MotionPro_cropped.mp4"
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                
-                # Calculate output dimensions
-                output_width = 512 if height != 512 else 320
-                output_height = height
-                
-                out = cv2.VideoWriter(str(output_file), fourcc, fps, (output_width, output_height))
-                
-                if not out.isOpened():
-                    print(f"  ✗ Failed to create output video writer")
-                    cap.release()
-                    errors.append(f"{subdir.name}/MotionPro.mp4: Failed to create output writer")
-                    continue
-                
-                # Process frames
-                frame_count = 0
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    # Crop the frame
-                    cropped_frame = crop_frame(frame, crop_params_adjusted)
-                    
-                    # Write the cropped frame
-                    out.write(cropped_frame)
-                    frame_count += 1
-                    
-                    if frame_count % 30 == 0:  # Progress update every 30 frames
-                        print(f"    Processed {frame_count}/{total_frames} frames")
-                
-                # Clean up
-                cap.release()
-                out.release()
-                
-                print(f"  ✓ Cropped video saved as: MotionPro_cropped.mp4")
-                print(f"    Output dimensions: {output_width}x{output_height}")
-                print(f"    Processed {frame_count} frames")
-                
-                total_processed += 1
-                
-            except Exception as e:
-                error_msg = f"  ✗ Failed to process MotionPro video: {e}"
-                print(error_msg)
-                errors.append(f"{subdir.name}/MotionPro.mp4: {e}")
-        else:
-            print(f"  - MotionPro.mp4 not found in {subdir.name}")
+    # Process the subdirectories of MC-Bench with a MotionPro video in parallel
+    result = _foreach_subdir(
+        base_path, "MotionPro.mp4", partial(_crop_one, crop_params=crop_params), max_workers,
+        default_jobs=max(1, (os.cpu_count() or 1) // 2), skip=is_up_to_date
+    )
+    if result is None:
+        return False
+    total_processed, errors = result
     
     # Summary
-    print(f"\n{'='*50}")
-    print(f"Cropping completed!")
-    print(f"Total videos processed: {total_processed}")
-    
-    if errors:
-        print(f"Errors encountered: {len(errors)}")
-        for error in errors:
-            print(f"  - {error}")
-    else:
-        print("No errors encountered!")
-    
-    return len(errors) == 0
+    counts = {"Total videos processed": total_processed}
+    if up_to_date:
+        counts["Up to date (skipped)"] = len(up_to_date)
+    return _print_summary("Cropping completed!", counts, errors)
+
+
+# Command line flag -> (action taking the parsed arguments, message printed on failure),
+# in the order the pipeline runs them
+ACTIONS = {
+    "rn_dl3dv": (lambda args: rename_videos_in_dl3dv(max_workers=args.jobs), "Failed to rename videos in DL3DV directory."),
+    "rn_mcbench": (lambda args: rename_mcbench_videos(max_workers=args.jobs), "Failed to rename videos in MC-Bench directory."),
+    "crop_motionpro": (lambda args: crop_motionpro_videos(max_workers=args.jobs, force=args.force), "Failed to crop MotionPro videos in MC-Bench directory."),
+    "concat_mcbench": (lambda args: concatenate_mcbench_videos(max_workers=args.jobs), "Failed to concatenate videos in MC-Bench directory."),
+    "concat_dl3dv": (lambda args: concatenate_dl3dv_videos(max_workers=args.jobs), "Failed to concatenate videos in DL3DV directory."),
+    "concat_user": (lambda args: concatenate_user_videos(max_workers=args.jobs), "Failed to concatenate user videos."),
+    "rencode_concat": (
+        lambda args: reencode_concatenated_videos(overwrite_for_rencode=args.overwrite_for_rencode, max_workers=args.jobs),
+        "Failed to re-encode concatenated videos."
+    ),
+}
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 def main():
@@ -928,31 +1794,18 @@ def main():
     parser.add_argument("--concat_user", action="store_true", help="Concatenate pairs of videos from UserCameraControl and UserObjectControl directories.")
     parser.add_argument("--rencode_concat", action="store_true", help="Re-encode all concatenated.mp4 files for better browser compatibility.")
     parser.add_argument("--overwrite_for_rencode", action="store_true", help="Overwrite the original concatenated.mp4 files for re-encoding.")
+    parser.add_argument("--force", action="store_true", help="Crop MotionPro videos again even if the cropped video is up to date.")
+    parser.add_argument("--jobs", type=_positive_int, default=None, help="Number of files processed in parallel (default: chosen per action from the CPU count).")
     args = parser.parse_args()
     
-    if args.rn_dl3dv:
-        if not rename_videos_in_dl3dv():
-            print("Failed to rename videos in DL3DV directory.")
-    elif args.rn_mcbench:
-        if not rename_mcbench_videos():
-            print("Failed to rename videos in MC-Bench directory.")
-    elif args.crop_motionpro:
-        if not crop_motionpro_videos():
-            print("Failed to crop MotionPro videos in MC-Bench directory.")
-    elif args.concat_mcbench:
-        if not concatenate_mcbench_videos():
-            print("Failed to concatenate videos in MC-Bench directory.")
-    elif args.concat_dl3dv:
-        if not concatenate_dl3dv_videos():
-            print("Failed to concatenate videos in DL3DV directory.")
-    elif args.concat_user:
-        if not concatenate_user_videos():
-            print("Failed to concatenate user videos.")
-    elif args.rencode_concat:
-        if not reencode_concatenated_videos(overwrite_for_rencode=args.overwrite_for_rencode):
-            print("Failed to re-encode concatenated videos.")
-    else:
+    # Run every selected action, in pipeline order
+    selected = [(action, failure_message) for flag, (action, failure_message) in ACTIONS.items() if getattr(args, flag)]
+    if not selected:
         print("No action specified. see --help for available options.")
+    
+    for action, failure_message in selected:
+        if not action(args):
+            print(failure_message)
 
 if __name__ == "__main__":
     main()